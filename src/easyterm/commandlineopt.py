@@ -1,4 +1,4 @@
-import sys, string, copy, re, os, warnings, io, shlex
+import sys, re, warnings, io, shlex
 from .colorprint import write
 
 __all__ = [
@@ -38,23 +38,17 @@ class CommandLineOptions(dict):
 
     """
 
-    accepted_option_chars = set(string.ascii_uppercase + string.ascii_lowercase)
     accepted_option_types = {bool, int, float, list, str}
 
     def __repr__(self):
-        max_charlen = max([len(k) for k in self]) if self else 0
+        items = sorted(self.items(), key=lambda kv: kv[0])
+        max_charlen = max((len(k) for k, v in items), default=0)
         return "\n".join(
-            [
-                f"{k:<{max_charlen}} : {type(self[k]).__name__:<5} = {self[k]}"
-                for k in sorted(self.keys())
-            ]
+            f"{k:<{max_charlen}} : {v.__class__.__name__:<5} = {v}" for k, v in items
         )
 
-    def __getitem__(self, name):
-        if name in self:
-            return dict.__getitem__(self, name)
-        else:
-            return None
+    def __missing__(self, name):
+        return None
 
     def write_config_file(self, fileh_or_path, sep="=", ordered_keys=None):
         """Write options into a format that can be later read with read_config_file"""
@@ -144,7 +138,7 @@ def command_line_options(
     default_opt,
     help_msg="Command line usage:...",
     positional_keys="",
-    synonyms={},
+    synonyms=None,
     tolerate_extra=False,
     tolerated_regexp=[],
     warning_extra=True,
@@ -166,7 +160,8 @@ def command_line_options(
         Possible value types are int, float, str, bool (whose argument can be omitted), list (multiple args accepted)
 
     help_msg : str
-        if any of -h | -help | --help are  provided, this help message is displayed and the script exits
+        if any of -h | -help | --help are  provided, this help message is displayed and the script exits,
+        without parsing the other options (unless -print_opt is also provided)
 
     positional_keys : iterable
         these keys will be associated, in order, to argumentss with no explicit keys (e.g. script.py arg1 arg2)
@@ -317,48 +312,59 @@ def command_line_options(
 
     opt = CommandLineOptions()
     arglist = sys.argv[1:] if arglist is None else arglist
-    for h in ("help", "-help"):
-        synonyms[h] = "h"  # built-in synonym
+    synonyms = dict(synonyms) if synonyms else {}  # not modifying the caller's dict
+    synonyms["help"] = "h"  # built-in synonym
+
+    ## below: identifying those bit which are an option, like '-k' or '-test' or '--char'
+    ## this is the only scan of arglist: positional handling below derives from it
+    opt_key_indices = _option_key_indices(arglist)
+
+    ## shortcut for help: if requested, other options need no checking or parsing
+    help_topic = _requested_help_topic(
+        arglist, opt_key_indices, synonyms, advanced_help_msg
+    )
+    if help_topic:
+        _write_help(help_msg, advanced_help_msg, help_topic)
+        sys.exit()
 
     ## checking default_opt and positional_keys
-    for opt_key in default_opt:
-        expected_type = type(default_opt[opt_key])
-        if not expected_type in CommandLineOptions.accepted_option_types:
-            raise CommandLineError(
-                (
-                    f"ERROR Only these value types are "
-                    f"accepted (default_opt): {CommandLineOptions.accepted_option_types} "
-                    f"-- Instead it was provided {expected_type} for -{opt_key}"
-                )
+    types = {k: type(v) for k, v in default_opt.items()}
+    bad_types = {
+        k: t
+        for k, t in types.items()
+        if not t in CommandLineOptions.accepted_option_types
+    }
+    if bad_types:
+        raise CommandLineError(
+            (
+                f"ERROR Only these value types are "
+                f"accepted (default_opt): {CommandLineOptions.accepted_option_types} "
+                f"-- Instead it was provided "
+                + ", ".join(f"{t} for -{k}" for k, t in bad_types.items())
             )
-        if expected_type is list and any(
-            [not type(x) is str for x in default_opt[opt_key]]
-        ):
-            raise CommandLineError(
-                (
-                    f"ERROR default options: each list type option must "
-                    f"contain string values only! Instead this was "
-                    f"provided for -{opt_key} : {default_opt[opt_key]}"
-                )
+        )
+    bad_lists = [
+        k
+        for k, t in types.items()
+        if t is list and any(type(x) is not str for x in default_opt[k])
+    ]
+    if bad_lists:
+        raise CommandLineError(
+            (
+                f"ERROR default options: each list type option must "
+                f"contain string values only! Instead this was provided for "
+                + ", ".join(f"-{k} : {default_opt[k]}" for k in bad_lists)
             )
-    if len([pk for pk in positional_keys if not pk in default_opt]):
+        )
+    missing_keys = [pk for pk in positional_keys if not pk in default_opt]
+    if missing_keys:
         raise CommandLineError(
             (
                 f"ERROR positional keys provided are absent from default options: "
-                f"{' '.join(['-'+pk for pk in positional_keys if not pk in default_opt])}"
+                f"{' '.join(['-'+pk for pk in missing_keys])}"
             )
         )
 
-    ## below: identifying those bit which are an option, like '-k' or '-test' or '--char'
-    opt_key_indices = [
-        i
-        for i, bit in enumerate(arglist)
-        if bit.startswith("-")
-        and len(bit.split()) == 1
-        and len(bit) > 1
-        and bit[1] in CommandLineOptions.accepted_option_chars
-    ]
-
     ## dealing with positional arguments, provided before explicit options (or with no options)
     positionals = None
     if len(arglist) and (not len(opt_key_indices) or opt_key_indices[0] != 0):
@@ -369,12 +375,14 @@ def command_line_options(
     ## dealing with positional arguments, provided after explicit options
     if len(arglist) and len(opt_key_indices):
         last_ki = opt_key_indices[-1]
-        last_k = arglist[last_ki].lstrip("-")
+        last_k = _key_name(arglist[last_ki])
+        last_k = synonyms.get(last_k, last_k)
+        last_type = types.get(last_k)
         if (
             last_ki < len(arglist) - 2
             and
-            # (type(default_opt[last_k]) is bool and last_ki < len(arglist)-1) )
-            not type(default_opt[last_k]) is list
+            # (last_type is bool and last_ki < len(arglist)-1) )
+            not last_type is list
         ):
             if positionals == "before":
                 raise CommandLineError(
@@ -382,8 +390,10 @@ def command_line_options(
                     f"OR after other options, not both! "
                 )
             positionals = "after"
-            if type(default_opt[last_k]) is bool:
-                if len(arglist) > last_ki + 1 and arglist[last_ki + 1] in ("0", "1"):
+            if last_type is bool:
+                # arglist[last_ki + 1] always exists here, given the test above
+                next_bit = arglist[last_ki + 1]
+                if next_bit == "0" or next_bit == "1":
                     from_here = last_ki + 2
                 else:
                     from_here = last_ki + 1
@@ -396,48 +406,48 @@ def command_line_options(
         if not positional_keys:
             positional_keys = []  # will result in error below; just saving some code
         insert_these = []
-        for i, value in enumerate(arglist[from_here:up_to]):
+        if up_to is None:
+            up_to = len(arglist)
+        for i in range(up_to - from_here):
             if len(positional_keys) < i + 1:
+                extra_args = " ".join(arglist[from_here + i : up_to])
                 if tolerate_extra:
                     warnings.warn(
-                        (
-                            f"command_line_options WARNING ignoring extra argument: "
-                            f"{' '.join(arglist[from_here+1:up_to])}"
-                        )
+                        f"command_line_options WARNING ignoring extra argument: {extra_args}"
                     )
                 else:
                     raise CommandLineError(
-                        (
-                            f"ERROR extra argument not accepted: "
-                            f"{' '.join(arglist[from_here+i:up_to])}"
-                        )
+                        f"ERROR extra argument not accepted: {extra_args}"
                     )
                 break
-            insert_these.append([from_here + i, positional_keys[i]])
-            if type(default_opt[positional_keys[i]]) is list:
+            insert_these.append((from_here + i, positional_keys[i]))
+            if types[positional_keys[i]] is list:
                 break
 
-        for i, key_opt in insert_these[::-1]:
-            arglist.insert(i, f"-{key_opt}")
+        ## building a new arglist in one go, rather than inserting in place;
+        ## keys already found are shifted instead of scanning arglist again
+        n_inserted = len(insert_these)
+        new_arglist = arglist[:from_here]
+        for i, key_opt in insert_these:
+            new_arglist.append(f"-{key_opt}")
+            new_arglist.append(arglist[i])
+        new_arglist.extend(arglist[from_here + n_inserted :])
+        opt_key_indices = (
+            [ki for ki in opt_key_indices if ki < from_here]
+            + [from_here + 2 * j for j in range(n_inserted)]
+            + [ki + n_inserted for ki in opt_key_indices if ki >= from_here]
+        )
+        arglist = new_arglist
 
-        opt_key_indices = [
-            i
-            for i, bit in enumerate(arglist)
-            if bit.startswith("-")
-            and len(bit.split()) == 1
-            and len(bit) > 1
-            and bit[1] in CommandLineOptions.accepted_option_chars
-        ]
+    ## compiling tolerated_regexp only once, rather than for each unexpected option
+    tolerated_patterns = [re.compile(w) for w in tolerated_regexp]
 
     #####
     ## main block: going one option at the time, parsing arglist
+    prev_is_list = False
     for ni, i in enumerate(opt_key_indices):
         ## some internal bits are ignored: e.g.   -n 8 these are all ignored -k 7
-        if (
-            ni > 0
-            and opt_key_indices[ni - 1] + 1 < i - 1
-            and not type(default_opt[opt_key]) is list
-        ):  # note here opt_key is the previous one
+        if ni > 0 and opt_key_indices[ni - 1] + 1 < i - 1 and not prev_is_list:
             if tolerate_extra:
                 warnings.warn(
                     (
@@ -454,117 +464,193 @@ def command_line_options(
                 )
 
         bit = arglist[i]
-        opt_key = bit.lstrip("-")
-        if opt_key in synonyms:
-            opt_key = synonyms[opt_key]
+        # interned, so that lookups in synonyms, default_opt and opt hit identity checks
+        opt_key = sys.intern(_key_name(bit))
+        opt_key = synonyms.get(opt_key, opt_key)
 
         ## Extra option, not present in default_opt
-        if not opt_key in default_opt:
+        expected_type = types.get(opt_key)
+        if expected_type is None:
             if tolerate_extra or (
-                len(tolerated_regexp) > 0
-                and match_any_word(opt_key, tolerated_regexp, ignore_case=False)
+                any(p.search(opt_key) for p in tolerated_patterns)
             ):
                 # not expecting this option but we tolerate it
                 if warning_extra:
                     warnings.warn(
                         f"command_line_options WARNING accepting unexpected command line option: -{opt_key}"
                     )
-                expected_type = None
             else:
                 raise CommandLineError(
                     f"ERROR Unexpected command line option: -{opt_key}"
                 )
-        else:
-            expected_type = type(default_opt[opt_key])
 
         ## assigning a value of the appropriate type
         next_ki = (
             opt_key_indices[ni + 1] if len(opt_key_indices) > ni + 1 else None
         )  # None if last option key
-
-        if not expected_type is list:
-            vi = i + 1  # value index in arglist
-            if (
-                (not next_ki is None and next_ki == vi)
-                or (next_ki is None)
-                and len(arglist) - 1 == i
-            ):
-                # option is provided without argument
-                if expected_type is bool or expected_type is None:
-                    value = True
-                else:
-                    raise CommandLineError(
-                        (
-                            f"ERROR {expected_type} expected type "
-                            f"for option -{opt_key} but no argument provided!"
-                        )
-                    )
-            else:
-                if (
-                    expected_type is None
-                ):  # if this option was not in default_opt, we cast it to string (unless it had no argument, in which case to bool)
-                    expected_type = str
-                if expected_type is bool:
-                    if arglist[i + 1] in ("1", "T", "True"):
-                        value = True
-                    elif arglist[i + 1] in ("0", "F", "False"):
-                        value = False
-                    elif opt_key == "h":
-                        if not advanced_help_msg:
-                            raise CommandLineError(
-                                f"ERROR option -h does not accept arguments. Received: {arglist[i+1]}"
-                            ) from None
-                        elif not arglist[i + 1] in advanced_help_msg:
-                            raise CommandLineError(
-                                f"ERROR argument {arglist[i+1]} is not accepted by option -h. Possible values: {' '.join(advanced_help_msg.keys())}"
-                            ) from None
-                        else:
-                            value = arglist[i + 1]  ## accepting non-bool value for -h
-                    else:
-                        raise CommandLineError(
-                            f"ERROR boolean options can only take values F, False, 0, or T, True, 1, or none. Received: -{opt_key} : {arglist[i+1]}"
-                        ) from None
-                else:
-                    try:
-                        value = expected_type(arglist[i + 1])
-                    except ValueError as e:
-                        raise CommandLineError(
-                            f"ERROR wrong type for option -{opt_key} : {e}"
-                        ) from None
-        else:  # expected_type is list: takes all values after this
-            vis = [
-                vi
-                for vi in range(i + 1, next_ki if not next_ki is None else len(arglist))
-            ]  # value indices
-            value = [arglist[vi] for vi in vis]  # list of strings
-        opt[opt_key] = value
+        opt[opt_key] = _value_parsers[expected_type](
+            opt_key,
+            expected_type,
+            arglist,
+            i,
+            next_ki if not next_ki is None else len(arglist),
+            advanced_help_msg,
+        )
+        prev_is_list = expected_type is list
 
     if add_defaults:
         ## adding default values which were not specified in command line
-        for opt_key in default_opt:
+        ## only lists are mutable among accepted types: others need no copy
+        for opt_key, value in default_opt.items():
             if not opt_key in opt:
-                opt[opt_key] = copy.copy(default_opt[opt_key])
+                opt[opt_key] = list(value) if type(value) is list else value
 
     ## Printing help message
-    if opt["h"]:
-        if advanced_help_msg and opt["h"] in advanced_help_msg:
-            if not None in advanced_help_msg:
-                write(help_msg)
-            elif advanced_help_msg[None]:
-                write(advanced_help_msg[None])
-            write(advanced_help_msg[opt["h"]])
-        else:
-            write(help_msg)
+    help_topic = opt["h"]
+    if help_topic:
+        _write_help(help_msg, advanced_help_msg, help_topic)
 
     if opt["print_opt"]:
         write(opt)
 
-    if "h" in opt and opt["h"]:
+    if help_topic:
         sys.exit()
 
     return opt
 
 
+def _option_key_indices(arglist):
+    """Returns the indices of arglist items which are option keys, like '-k', '-test' or '--char'.
+    The first char of the name must be an ASCII letter: negative numbers like '-1',
+    '-é' or strings with whitespace are not considered keys"""
+    return [
+        i
+        for i, bit in enumerate(arglist)
+        if len(bit) > 1
+        and bit[0] == "-"
+        and (
+            _is_ascii_letter(bit[1]) or bit[1] == "-" and _is_ascii_letter(bit[2:3])
+        )
+        and len(bit.split()) == 1
+    ]
+
+
+def _is_ascii_letter(char):
+    """True if char is a single ASCII letter. str.isalpha alone accepts any unicode letter,
+    and str.isascii is not available before python 3.7"""
+    return char < "\x80" and char.isalpha()
+
+
+def _key_name(bit):
+    """Option name from an option key found by _option_key_indices: '-k' -> 'k', '--char' -> 'char'"""
+    return bit[2:] if bit[1] == "-" else bit[1:]
+
+
+def _requested_help_topic(arglist, opt_key_indices, synonyms, advanced_help_msg):
+    """Checks whether help is requested in arglist, before any parsing.
+    Returns True for plain -h, the argument of -h if it is a key of advanced_help_msg,
+    or None when help is not requested or the full parsing is required:
+    i.e. -h has an invalid argument (so that the usual error is raised), or -print_opt is also present"""
+    help_ki = None
+    for ki in opt_key_indices:
+        opt_key = _key_name(arglist[ki])
+        opt_key = synonyms.get(opt_key, opt_key)
+        if opt_key == "h":
+            help_ki = ki  # the last occurrence wins, as in normal parsing
+        elif opt_key == "print_opt":
+            return None
+    if help_ki is None:
+        return None
+    if help_ki + 1 == len(arglist) or help_ki + 1 in opt_key_indices:
+        return True  # -h provided without argument
+    arg = arglist[help_ki + 1]
+    if arg in ("1", "T", "True"):
+        return True
+    elif advanced_help_msg and arg in advanced_help_msg:
+        return arg
+    return None
+
+
+def _write_help(help_msg, advanced_help_msg, help_topic):
+    """Writes the help message; help_topic is True, or a key of advanced_help_msg"""
+    if advanced_help_msg and help_topic in advanced_help_msg:
+        if not None in advanced_help_msg:
+            write(help_msg)
+        elif advanced_help_msg[None]:
+            write(advanced_help_msg[None])
+        write(advanced_help_msg[help_topic])
+    else:
+        write(help_msg)
+
+
+def _parse_bool(opt_key, expected_type, arglist, i, next_ki, advanced_help_msg):
+    """Value of a bool option at arglist[i]; -h also accepts the keys of advanced_help_msg"""
+    if next_ki == i + 1:
+        return True  # option is provided without argument
+    arg = arglist[i + 1]
+    if arg in ("1", "T", "True"):
+        return True
+    elif arg in ("0", "F", "False"):
+        return False
+    elif opt_key == "h":
+        if not advanced_help_msg:
+            raise CommandLineError(
+                f"ERROR option -h does not accept arguments. Received: {arg}"
+            ) from None
+        elif not arg in advanced_help_msg:
+            raise CommandLineError(
+                f"ERROR argument {arg} is not accepted by option -h. Possible values: {' '.join(advanced_help_msg.keys())}"
+            ) from None
+        return arg  ## accepting non-bool value for -h
+    raise CommandLineError(
+        f"ERROR boolean options can only take values F, False, 0, or T, True, 1, or none. Received: -{opt_key} : {arg}"
+    ) from None
+
+
+def _parse_scalar(opt_key, expected_type, arglist, i, next_ki, advanced_help_msg):
+    """Value of an int, float or str option at arglist[i], cast to expected_type"""
+    if next_ki == i + 1:
+        raise CommandLineError(
+            (
+                f"ERROR {expected_type} expected type "
+                f"for option -{opt_key} but no argument provided!"
+            )
+        )
+    try:
+        return expected_type(arglist[i + 1])
+    except ValueError as e:
+        raise CommandLineError(
+            f"ERROR wrong type for option -{opt_key} : {e}"
+        ) from None
+
+
+def _parse_list(opt_key, expected_type, arglist, i, next_ki, advanced_help_msg):
+    """Value of a list option at arglist[i]: takes all values up to the next option"""
+    return arglist[i + 1 : next_ki]  # list of strings
+
+
+def _parse_extra(opt_key, expected_type, arglist, i, next_ki, advanced_help_msg):
+    """Value of an option absent from default_opt: str if it has an argument, otherwise True"""
+    if next_ki == i + 1:
+        return True
+    return arglist[i + 1]
+
+
+## functions to parse option values, by the type of their default value
+## (None for tolerated options absent from default_opt)
+## Each is called as fn(opt_key, expected_type, arglist, i, next_ki, advanced_help_msg)
+## where i is the index of the option key in arglist, and next_ki the index of the next key
+## (or len(arglist) if this is the last)
+_value_parsers = {
+    bool: _parse_bool,
+    int: _parse_scalar,
+    float: _parse_scalar,
+    str: _parse_scalar,
+    list: _parse_list,
+    None: _parse_extra,
+}
+
+
 def read_config_file(fileh_or_path, types_from=None, sep="=", comment_char="#"):
     """Reads parameters from a configuration file
 